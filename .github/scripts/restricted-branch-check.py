@@ -2,231 +2,610 @@
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
-#     "jira>=3.5.0",
 #     "requests>=2.31.0",
-#     "GitPython>=3.1.32"
+#     "lxml>=5.1.0",
+#     "orjson>=3.9.0"
 # ]
 # [tool.uv]
 # exclude-newer = "2025-02-19T00:00:00Z"
 # ///
 
+import io
 import os
 import re
 import sys
 import json
+import mmap
+import posixpath
 import shutil
+import tarfile
 import tempfile
-from jira import JIRA
-from pathlib import Path
-from xml.etree import ElementTree
+import time
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator
+from lxml import etree as ElementTree
 import requests
-import git
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JIRA issue keys, e.g. MB-12345
+_JIRA_RE = re.compile(r"\b[A-Z]{2,5}-[0-9]{1,6}(?![-0-9])\b")
+
+# Manifest tag and attribute names looked up for every element scanned
+_PROJECT, _EXTEND, _DEFAULT, _NAME, _REVISION = map(
+    sys.intern, ("project", "extend-project", "default", "name", "revision")
+)
+_MANIFEST_TAGS = (_DEFAULT, _PROJECT, _EXTEND)
+
+# Shared HTTP session so GitHub and JIRA requests reuse pooled connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Age after which a manifest cache entry (an unused SHA checkout, or a staging
+# directory left by a killed run) can no longer be in use by another run
+_STALE_CACHE_ENTRY_SECONDS = 60 * 60
+
+# Tarball of the manifest repository at a given ref
+_MANIFEST_ARCHIVE_URL = "https://codeload.github.com/couchbase/manifest/tar.gz/{ref}"
+
+
+def fetch_manifest_repo(temp_dir: Path, ref: str = "refs/heads/master") -> Path:
+    """Download and extract a tarball of the manifest repository into a temporary directory."""
+    # Only the working tree is read, so a snapshot of the requested ref is all we need
+    url = _MANIFEST_ARCHIVE_URL.format(ref=ref)
+    with _SESSION.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+            # Reject absolute paths, links outside the tree etc. where supported
+            if hasattr(tarfile, "data_filter"):
+                tar.extraction_filter = tarfile.data_filter
+            tar.extractall(temp_dir)
+
+    # The archive holds a single top-level directory, e.g. manifest-master/
+    extracted_dirs = [path for path in temp_dir.iterdir() if path.is_dir()]
+    if len(extracted_dirs) != 1:
+        raise RuntimeError(f"Expected one top-level directory in manifest archive, found {len(extracted_dirs)}")
+    return extracted_dirs[0]
+
+
+def get_manifest_head_sha(gh_token: str) -> str | None:
+    """Get the commit SHA at the tip of the manifest repository's master branch."""
+    # Allow the workflow to pass in the SHA it already resolved for its cache key
+    sha = os.getenv('MANIFEST_SHA')
+    if sha:
+        return sha
+
+    commit_url = "https://api.github.com/repos/couchbase/manifest/commits/master"
+    headers = {"Authorization": f"Bearer {gh_token}", "Accept": "application/vnd.github.sha"}
 
-
-def clone_manifest_repo(temp_dir: Path) -> Path:
-    """Clone the manifest repository to a temporary directory."""
-    manifest_dir = temp_dir / "manifest"
-    git.Repo.clone_from("https://github.com/couchbase/manifest.git", manifest_dir)
-    return manifest_dir
-
-
-def find_all_manifests(manifest_dir: Path) -> list[Path]:
-    """Find all XML manifest files in the repository."""
-    manifest_files = []
-    for xml_file in manifest_dir.rglob("*.xml"):
-        # Skip files in .git directory and other non-manifest files
-        if xml_file.name not in ["pom.xml"]:
-            # Skip toy/ and released/ directories
-            relative_path = xml_file.relative_to(manifest_dir)
-            path_parts = relative_path.parts
-            if path_parts[0] not in ["toy", "released"]:
-                manifest_files.append(xml_file)
-    return manifest_files
-
-
-def parse_manifest(manifest_path: Path) -> dict:
-    """Parse a manifest XML file and extract project information."""
     try:
-        tree = ElementTree.parse(manifest_path)
-        root = tree.getroot()
-
-        # Get default branch
-        default_branch = "master"
-        default_elem = root.find("default")
-        if default_elem is not None:
-            default_branch = default_elem.get("revision", "master")
-
-        # Extract all projects
-        projects = []
-        for project_elem in root.findall("project"):
-            project_name = project_elem.get("name")
-            project_revision = project_elem.get("revision", default_branch)
-            if project_name:
-                projects.append({
-                    "name": project_name,
-                    "revision": project_revision
-                })
-
-        # Also check extend-project elements
-        for project_elem in root.findall("extend-project"):
-            project_name = project_elem.get("name")
-            project_revision = project_elem.get("revision", default_branch)
-            if project_name:
-                projects.append({
-                    "name": project_name,
-                    "revision": project_revision
-                })
-
-        return {
-            "projects": projects,
-            "default_branch": default_branch,
-            "manifest_tree": root
-        }
+        response = _SESSION.get(commit_url, headers=headers, timeout=10)
+    except requests.RequestException as e:
+        print(f"Warning: Could not resolve manifest repository HEAD: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"Warning: GitHub API returned {response.status_code} when resolving manifest repository HEAD")
+        return None
+    return response.text.strip()
+
+
+def get_cached_manifest_repo(tool_cache: str, sha: str) -> Path:
+    """Get the manifest repository at the given SHA from RUNNER_TOOL_CACHE, downloading it there if needed."""
+    cache_root = Path(tool_cache) / "couchbase-manifest"
+    cached_dir = cache_root / sha
+    if cached_dir.is_dir():
+        print(f"Using cached manifest repository at {sha}")
+        # Mark the entry as in use so other runs don't prune it while we scan it
+        os.utime(cached_dir)
+        return cached_dir
+
+    # Fetch alongside the cache entry, then rename into place so a partial
+    # download is never mistaken for a complete checkout
+    cache_root.mkdir(parents=True, exist_ok=True)
+    staging_dir = Path(tempfile.mkdtemp(dir=cache_root, prefix=".staging-"))
+    try:
+        manifest_dir = fetch_manifest_repo(staging_dir, sha)
+        try:
+            manifest_dir.rename(cached_dir)
+        except OSError:
+            # Another run populated the cache first
+            if not cached_dir.is_dir():
+                raise
+        # The extracted directory carries the archive's timestamp; mark it as just used
+        os.utime(cached_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    prune_manifest_cache(cache_root, cached_dir)
+    return cached_dir
+
+
+def prune_manifest_cache(cache_root: Path, cached_dir: Path) -> None:
+    """Remove cached checkouts of older SHAs and staging directories left behind by killed runs.
+
+    Entries used within _STALE_CACHE_ENTRY_SECONDS are kept, as another run
+    may still be downloading into or scanning them.
+    """
+    now = time.time()
+    for entry in cache_root.iterdir():
+        if entry == cached_dir or not entry.is_dir():
+            continue
+        try:
+            if now - entry.stat().st_mtime < _STALE_CACHE_ENTRY_SECONDS:
+                continue
+        except OSError:
+            continue
+        print(f"Removing stale manifest cache entry {entry.name}")
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def manifest_file_kind(filename: str) -> str | None:
+    """Classify a file in the manifest repository as "xml" (a manifest), "product" (a product config) or neither."""
+    if filename == "product-config.json":
+        return "product"
+    if filename.endswith(".xml") and filename not in ["pom.xml"]:
+        return "xml"
+    return None
+
+
+def raise_walk_error(error: OSError) -> None:
+    """os.walk error handler that propagates the error."""
+    raise error
+
+
+def scan_manifest_tree(manifest_dir: Path) -> Iterator[tuple[str, Path]]:
+    """Walk the manifest repository once, yielding ("xml", path) and ("product", path) entries."""
+    # Raise rather than silently skip unreadable directories, so a tree that
+    # vanishes mid-scan can't look like one without restricted manifests
+    for dirpath, dirnames, filenames in os.walk(manifest_dir, onerror=raise_walk_error):
+        # Prune .git everywhere and toy/ and released/ at the top level so we never descend into them
+        dirnames[:] = [
+            d for d in dirnames
+            if d != ".git" and not (dirpath == str(manifest_dir) and d in ["toy", "released"])
+        ]
+        for filename in filenames:
+            kind = manifest_file_kind(filename)
+            if kind:
+                yield kind, Path(dirpath, filename)
+
+
+def may_reference(manifest_path: Path, project_name: str) -> bool:
+    """Cheaply rule out manifests that don't contain the project name anywhere in their raw bytes."""
+    try:
+        with open(manifest_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(project_name.encode()) != -1
+    except (OSError, ValueError):
+        # e.g. empty files, which can't be mapped; let the parser report them
+        return True
+
+
+def manifest_references(manifest_path: Path | PurePosixPath, project_name: str, branch_name: str,
+                        manifest_file: BinaryIO | None = None) -> bool:
+    """Check if a manifest references the given project/branch, stopping at the first match.
+
+    The manifest is read from manifest_file if given, otherwise from manifest_path.
+    """
+    source = manifest_file if manifest_file is not None else str(manifest_path)
+    default_branch = None
+    # Projects named project_name which rely on the default revision, held
+    # until we know what the default is (<default> may follow <project>)
+    pending_default = False
+    try:
+        for _, elem in ElementTree.iterparse(source, events=("end",), tag=_MANIFEST_TAGS):
+            # Like root.find()/findall(), only consider direct children of the root
+            parent = elem.getparent()
+            top_level = parent is not None and parent.getparent() is None
+            if top_level and elem.tag == _DEFAULT:
+                # The first <default> wins, as with root.find("default")
+                if default_branch is None:
+                    default_branch = elem.get(_REVISION, "master")
+                    if pending_default and default_branch == branch_name:
+                        return True
+            elif top_level and elem.get(_NAME) == project_name:
+                revision = elem.get(_REVISION)
+                if revision is None:
+                    if default_branch is None:
+                        pending_default = True
+                    elif default_branch == branch_name:
+                        return True
+                elif revision == branch_name:
+                    return True
+            # Free each element once handled, and drop the emptied shells of
+            # earlier siblings so the root doesn't keep accumulating them
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except OSError:
+        # The manifest couldn't be read at all (e.g. it vanished); don't treat
+        # that as "not referenced", let the caller fall back
+        raise
     except Exception as e:
         print(f"Warning: Could not parse manifest {manifest_path}: {e}")
-        return {"projects": [], "default_branch": "master", "manifest_tree": None}
+        return False
+
+    # No <default> element means projects without a revision track master
+    return pending_default and default_branch is None and branch_name == "master"
+
+
+def parse_product_config(raw_config: bytes) -> dict:
+    """Parse a product-config.json straight from bytes, with orjson when it's available."""
+    return orjson.loads(raw_config) if orjson else json.loads(raw_config)
 
 
-def load_product_configs(manifest_dir: Path) -> dict:
-    """Load all product-config.json files and their associated restriction info."""
+def load_manifest_tree(manifest_dir: Path) -> tuple[list[Path], dict]:
+    """Find all XML manifest files and load all product-config.json files in a single pass."""
+    manifest_files = []
     product_configs = {}
 
-    for config_file in manifest_dir.rglob("product-config.json"):
+    for kind, path in scan_manifest_tree(manifest_dir):
+        if kind == "xml":
+            manifest_files.append(path)
+            continue
+
         try:
-            with open(config_file, 'r') as f:
-                config_data = json.load(f)
+            config_data = parse_product_config(path.read_bytes())
 
             # Get the product directory (parent of product-config.json)
-            product_dir = config_file.parent
+            product_dir = path.parent
             relative_product_dir = product_dir.relative_to(manifest_dir)
 
             product_configs[str(relative_product_dir)] = config_data
 
         except Exception as e:
-            print(f"Warning: Could not load product config {config_file}: {e}")
+            print(f"Warning: Could not load product config {path}: {e}")
+
+    return manifest_files, product_configs
+
 
-    return product_configs
+def build_restriction_index(product_configs: dict) -> dict[str, list[tuple[str, str, dict]]]:
+    """Index product config manifest entries by manifest key for direct lookup."""
+    restriction_index = {}
 
+    for product_dir, config_data in product_configs.items():
+        for manifest_key, manifest_config in config_data.get("manifests", {}).items():
+            # Windows path compatibility
+            normalized_key = manifest_key.replace("\\", "/")
+            restriction_index.setdefault(normalized_key, []).append(
+                (product_dir, manifest_key, manifest_config)
+            )
 
-def check_project_in_manifest(project_name: str, branch_name: str, manifest_data: dict) -> bool:
-    """Check if a project/branch combination is referenced in a manifest."""
-    for project in manifest_data["projects"]:
-        if project["name"] == project_name:
-            # If project found, check if branch matches
-            if project["revision"] == branch_name:
-                return True
-            # Also check if the manifest's default branch matches and project uses default
-            if project["revision"] == manifest_data["default_branch"] and branch_name == manifest_data["default_branch"]:
-                return True
-    return False
+    return restriction_index
+
+
+def find_restrictions(relative_manifest_path: Path | PurePosixPath,
+                      restriction_index: dict) -> list[tuple[str, dict]]:
+    """Return the restricted product config entries for a manifest as (key, manifest) pairs."""
+    restricted = []
+
+    # Look up the full relative path first, then just the filename; a
+    # product config only contributes its first matching entry
+    matched_product_dirs = set()
+    for lookup_key in (relative_manifest_path.as_posix(), relative_manifest_path.name):
+        for product_dir, manifest_key, manifest_config in restriction_index.get(lookup_key, []):
+            if product_dir in matched_product_dirs:
+                continue
+            matched_product_dirs.add(product_dir)
+
+            if manifest_config.get("restricted", False):
+                approval_ticket = manifest_config.get("approval_ticket")
+                if approval_ticket:
+                    restricted.append((manifest_key, {
+                        "manifest_path": str(relative_manifest_path),
+                        "product_dir": product_dir,
+                        "approval_ticket": approval_ticket,
+                        "release_name": manifest_config.get("release_name", manifest_key),
+                        "config": manifest_config
+                    }))
+
+    return restricted
+
+
+def scan_one(manifest_file: Path, manifest_dir: Path, project_name: str, branch_name: str,
+             restriction_index: dict) -> list[tuple[str, dict]] | None:
+    """Check one manifest for the project/branch and return its restricted entries as (key, manifest) pairs.
+
+    Returns None if the manifest doesn't reference the project/branch. Runs in
+    a worker process, so results are returned for the caller to report.
+    """
+    # Check if this manifest references our project/branch, skipping the
+    # parse entirely when the name doesn't appear in the file at all
+    if not may_reference(manifest_file, project_name):
+        return None
+    if not manifest_references(manifest_file, project_name, branch_name):
+        return None
+
+    # Now check if this manifest is restricted in any product config
+    return find_restrictions(manifest_file.relative_to(manifest_dir), restriction_index)
 
 
 def get_restricted_manifests(project_name: str, branch_name: str, manifest_dir: Path) -> list[dict]:
     """Find all restricted manifests that reference the given project/branch."""
     restricted_manifests = []
 
-    # Load all product configs
-    product_configs = load_product_configs(manifest_dir)
+    # Find all manifest files and product configs, and index the configs' manifest entries
+    manifest_files, product_configs = load_manifest_tree(manifest_dir)
+    restriction_index = build_restriction_index(product_configs)
 
-    # Find all manifest files
-    manifest_files = find_all_manifests(manifest_dir)
+    # Parsing is CPU-bound and independent per manifest, so spread it across cores
+    scan = functools.partial(scan_one, manifest_dir=manifest_dir, project_name=project_name,
+                             branch_name=branch_name, restriction_index=restriction_index)
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(scan, manifest_files, chunksize=16)
 
-    for manifest_file in manifest_files:
-        # Parse the manifest
-        manifest_data = parse_manifest(manifest_file)
-
-        # Check if this manifest references our project/branch
-        if check_project_in_manifest(project_name, branch_name, manifest_data):
+        for manifest_file, restricted in zip(manifest_files, results):
+            if restricted is None:
+                continue
             print(f"Project {project_name} (branch: {branch_name}) found in manifest: {manifest_file}")
 
-            # Now check if this manifest is restricted in any product config
-            relative_manifest_path = manifest_file.relative_to(manifest_dir)
-
-            for product_dir, config_data in product_configs.items():
-                manifests_config = config_data.get("manifests", {})
-
-                # Check various possible manifest path formats
-                manifest_keys_to_check = [
-                    str(relative_manifest_path),
-                    str(relative_manifest_path).replace("\\", "/"),  # Windows path compatibility
-                    manifest_file.name,  # Just filename
-                ]
-
-                for manifest_key in manifest_keys_to_check:
-                    if manifest_key in manifests_config:
-                        manifest_config = manifests_config[manifest_key]
-                        if manifest_config.get("restricted", False):
-                            approval_ticket = manifest_config.get("approval_ticket")
-                            if approval_ticket:
-                                restricted_manifests.append({
-                                    "manifest_path": str(relative_manifest_path),
-                                    "product_dir": product_dir,
-                                    "approval_ticket": approval_ticket,
-                                    "release_name": manifest_config.get("release_name", manifest_key),
-                                    "config": manifest_config
-                                })
-                                print(f"Found restricted manifest: {manifest_key} (approval ticket: {approval_ticket})")
-                        break
+            for manifest_key, restricted_manifest in restricted:
+                restricted_manifests.append(restricted_manifest)
+                print(f"Found restricted manifest: {manifest_key} (approval ticket: {restricted_manifest['approval_ticket']})")
 
     return restricted_manifests
 
 
-def connect_jira(jira_url: str, jira_user: str, jira_token: str) -> JIRA:
-    """Connect to JIRA API using credentials."""
-    jira = JIRA(jira_url, basic_auth=(jira_user, jira_token))
-    return jira
+def archive_member_path(name: str) -> PurePosixPath | None:
+    """Get a tarball member's path relative to the repository, stripping the archive's top-level directory."""
+    parts = PurePosixPath(posixpath.normpath(name)).parts
+    if len(parts) < 2 or parts[0] in ["/", ".."] or ".." in parts:
+        return None
+    return PurePosixPath(*parts[1:])
+
+
+def archive_link_target(member: tarfile.TarInfo) -> PurePosixPath | None:
+    """Get the repository-relative path a symlink or hard link member points to, if it stays inside the archive."""
+    if member.issym():
+        if posixpath.isabs(member.linkname):
+            return None
+        target = posixpath.join(posixpath.dirname(member.name), member.linkname)
+    else:
+        # Hard link names are relative to the archive root
+        target = member.linkname
+    return archive_member_path(target)
+
+
+def is_scanned_manifest_path(relative_path: PurePosixPath) -> bool:
+    """Check a repository-relative path isn't under .git, toy/ or released/, which a checkout scan skips."""
+    dir_parts = relative_path.parts[:-1]
+    return ".git" not in dir_parts and not (dir_parts and dir_parts[0] in ["toy", "released"])
+
+
+def stream_restricted_manifests(project_name: str, branch_name: str, ref: str = "refs/heads/master") -> list[dict]:
+    """Find all restricted manifests that reference the given project/branch, parsing the repository tarball as it downloads."""
+    restricted_manifests = []
+    product_configs = {}
+    name_bytes = project_name.encode()
+
+    # Results for every regular manifest and raw bytes of every product
+    # config, including those under toy/ and released/, as links elsewhere in
+    # the tree may point at them
+    manifest_results = {}
+    product_config_data = {}
+    links = {}
+
+    url = _MANIFEST_ARCHIVE_URL.format(ref=ref)
+    with _SESSION.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+            for member in tar:
+                relative_path = archive_member_path(member.name)
+                if relative_path is None or ".git" in relative_path.parts[:-1]:
+                    continue
+
+                # Links are resolved once every file they might point at has been seen
+                if member.issym() or member.islnk():
+                    links[relative_path] = archive_link_target(member)
+                    continue
+                if not member.isfile():
+                    continue
+
+                kind = manifest_file_kind(relative_path.name)
+                if kind is None:
+                    continue
+                data = tar.extractfile(member).read()
+
+                if kind == "product":
+                    product_config_data[relative_path] = data
+                else:
+                    # Only parse manifests that mention the project name at all
+                    manifest_results[relative_path] = name_bytes in data and manifest_references(
+                        relative_path, project_name, branch_name, io.BytesIO(data))
+
+    # Symlinked manifests and product configs are scanned in a checkout too, so
+    # give each link its target's result
+    for link_path, target in links.items():
+        kind = manifest_file_kind(link_path.name)
+        if kind is None or not is_scanned_manifest_path(link_path):
+            continue
+        # Follow chains of links, giving up on cycles
+        seen = {link_path}
+        while target in links and target not in seen:
+            seen.add(target)
+            target = links[target]
+
+        if kind == "xml" and target in manifest_results:
+            manifest_results[link_path] = manifest_results[target]
+        elif kind == "product" and target in product_config_data:
+            product_config_data[link_path] = product_config_data[target]
+        else:
+            print(f"Warning: Could not resolve link {link_path} in manifest repository")
+
+    for relative_path, data in product_config_data.items():
+        if not is_scanned_manifest_path(relative_path):
+            continue
+        try:
+            product_configs[str(relative_path.parent)] = parse_product_config(data)
+        except Exception as e:
+            print(f"Warning: Could not load product config {relative_path}: {e}")
+
+    matched_manifests = []
+    for relative_path, referenced in manifest_results.items():
+        if referenced and is_scanned_manifest_path(relative_path):
+            print(f"Project {project_name} (branch: {branch_name}) found in manifest: {relative_path}")
+            matched_manifests.append(relative_path)
+
+    # Restrictions can only be resolved once every product config has been seen
+    restriction_index = build_restriction_index(product_configs)
+    for relative_path in matched_manifests:
+        for manifest_key, restricted_manifest in find_restrictions(relative_path, restriction_index):
+            restricted_manifests.append(restricted_manifest)
+            print(f"Found restricted manifest: {manifest_key} (approval ticket: {restricted_manifest['approval_ticket']})")
+
+    return restricted_manifests
+
+
+def find_restricted_manifests(project_name: str, branch_name: str, gh_token: str) -> list[dict]:
+    """Find all restricted manifests that reference the given project/branch.
+
+    Uses a checkout cached under RUNNER_TOOL_CACHE when one is available,
+    otherwise (or if the cache can't be used) streams the manifest repository
+    without writing it to disk.
+    """
+    tool_cache = os.getenv('RUNNER_TOOL_CACHE')
+    sha = get_manifest_head_sha(gh_token) if tool_cache else None
+    if not sha:
+        return stream_restricted_manifests(project_name, branch_name)
+
+    try:
+        manifest_dir = get_cached_manifest_repo(tool_cache, sha)
+        return get_restricted_manifests(project_name, branch_name, manifest_dir)
+    except Exception as e:
+        # e.g. an unwritable or full tool cache; a plain download still works
+        print(f"Warning: Could not use cached manifest repository, streaming it instead: {e}")
+        # Stay on the revision the cache was keyed on
+        return stream_restricted_manifests(project_name, branch_name, ref=sha)
+
+
+def get_commit_messages_graphql(repo: str, pr_number: str, headers: dict) -> list[str] | None:
+    """Fetch all commit messages in the PR with the GitHub GraphQL API, 100 per request.
+
+    Returns None if GraphQL can't be used, so the caller can fall back to REST.
+    """
+    # GraphQL needs an owner/name repository and a numeric PR number
+    owner, _, name = repo.partition('/')
+    if not owner or not name or not pr_number.isdigit():
+        print(f"Warning: Cannot query GitHub GraphQL API for repository '{repo}' PR #{pr_number}")
+        return None
+
+    query = """
+        query($owner: String!, $name: String!, $number: Int!, $cursor: String) {
+          repository(owner: $owner, name: $name) {
+            pullRequest(number: $number) {
+              commits(first: 100, after: $cursor) {
+                nodes { commit { message } }
+                pageInfo { hasNextPage endCursor }
+              }
+            }
+          }
+        }
+    """
+    variables = {"owner": owner, "name": name, "number": int(pr_number), "cursor": None}
+    messages = []
+
+    while True:
+        try:
+            response = _SESSION.post("https://api.github.com/graphql", headers=headers,
+                                     json={"query": query, "variables": variables}, timeout=10)
+            if response.status_code != 200:
+                print(f"Warning: GitHub GraphQL API returned {response.status_code} when fetching commits for PR #{pr_number}")
+                return None
+            data = response.json()
+        except requests.RequestException as e:
+            print(f"Warning: GitHub GraphQL API request failed when fetching commits for PR #{pr_number}: {e}")
+            return None
+
+        pull_request = ((data.get("data") or {}).get("repository") or {}).get("pullRequest")
+        if data.get("errors") or not pull_request:
+            print(f"Warning: GitHub GraphQL API could not fetch commits for PR #{pr_number}: {data.get('errors')}")
+            return None
+
+        commits = pull_request["commits"]
+        messages.extend(node["commit"]["message"] for node in commits["nodes"])
+        if not commits["pageInfo"]["hasNextPage"]:
+            return messages
+        variables["cursor"] = commits["pageInfo"]["endCursor"]
+
+
+def get_commit_messages_rest(repo: str, pr_number: str, headers: dict) -> list[str] | None:
+    """Fetch all commit messages in the PR with the GitHub REST API, following pagination."""
+    commits_url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}/commits"
+    params = {"per_page": 100}
+    messages = []
+
+    while commits_url:
+        response = _SESSION.get(commits_url, headers=headers, params=params, timeout=10)
+        if response.status_code != 200:
+            print(f"Error: GitHub API returned {response.status_code} when fetching commits for PR #{pr_number}")
+            return None
+
+        for commit in response.json():
+            messages.append(commit.get('commit', {}).get('message', ''))
+
+        # The next link already carries the query string
+        commits_url = response.links.get("next", {}).get("url")
+        params = None
+
+    return messages
 
 
 def get_jira_keys_from_commits(repo: str, pr_number: str, gh_token: str) -> set[str]:
     """Extract JIRA issue keys from commit messages in the PR."""
-    commits_url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}/commits"
     headers = {"Authorization": f"Bearer {gh_token}", "Accept": "application/vnd.github+json"}
 
-    response = requests.get(commits_url, headers=headers, timeout=10)
-    if response.status_code != 200:
-        print(f"Error: GitHub API returned {response.status_code} when fetching commits for PR #{pr_number}")
+    # A single GraphQL request covers up to 100 commits; fall back to REST if it fails
+    messages = get_commit_messages_graphql(repo, pr_number, headers)
+    if messages is None:
+        messages = get_commit_messages_rest(repo, pr_number, headers)
+    if messages is None:
         return set()
 
-    commits = response.json()
     jira_keys = set()
-
-    for commit in commits:
-        msg = commit.get('commit', {}).get('message', '')
-        keys = re.findall(r"\b[A-Z]{2,5}-[0-9]{1,6}(?![-0-9])\b", msg)
-        jira_keys.update(keys)
+    for msg in messages:
+        jira_keys.update(_JIRA_RE.findall(msg))
 
     return jira_keys
 
 
-def get_approved_jira_keys(approval_ticket: str, jira_url: str, jira_user: str, jira_token: str) -> set[str]:
-    """Get all JIRA keys that are approved (linked to or subtasks of the approval ticket)."""
-    jira = connect_jira(jira_url, jira_user, jira_token)
+@functools.lru_cache(maxsize=None)
+def get_approved_jira_keys(approval_ticket: str, jira_url: str, jira_user: str, jira_token: str) -> frozenset[str]:
+    """Get all JIRA keys that are approved (linked to or subtasks of the approval ticket).
+
+    Results are memoized per ticket, as restricted manifests often share an approval ticket.
+    """
+    issue_url = f"{jira_url}/rest/api/2/issue/{approval_ticket}"
 
     try:
-        jira_issue = jira.issue(approval_ticket)
+        response = _SESSION.get(issue_url, params={"fields": "issuelinks,subtasks"},
+                                auth=(jira_user, jira_token), timeout=10)
+        response.raise_for_status()
+        fields = response.json().get("fields", {})
         approved_keys = set()
 
         # Add linked issues
-        if hasattr(jira_issue.fields, 'issuelinks'):
-            for link in jira_issue.fields.issuelinks:
-                if hasattr(link, 'outwardIssue'):
-                    approved_keys.add(link.outwardIssue.key)
-                if hasattr(link, 'inwardIssue'):
-                    approved_keys.add(link.inwardIssue.key)
+        for link in fields.get("issuelinks", []):
+            if "outwardIssue" in link:
+                approved_keys.add(link["outwardIssue"]["key"])
+            if "inwardIssue" in link:
+                approved_keys.add(link["inwardIssue"]["key"])
 
         # Add subtasks
-        if hasattr(jira_issue.fields, 'subtasks'):
-            for subtask in jira_issue.fields.subtasks:
-                approved_keys.add(subtask.key)
+        for subtask in fields.get("subtasks", []):
+            approved_keys.add(subtask["key"])
 
         # Add the approval ticket itself
         approved_keys.add(approval_ticket)
 
-        return approved_keys
+        return frozenset(approved_keys)
 
     except Exception as e:
         print(f"Error: Failed to fetch JIRA issue {approval_ticket}: {e}")
-        return set()
+        return frozenset()
 
 
 def main():
@@ -259,63 +638,67 @@ def main():
     # Extract project name from repo (assuming format "owner/project-name")
     project_name = repo.split('/')[-1] if '/' in repo else repo
 
-    # Create temporary directory and clone manifest repo
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        try:
-            manifest_dir = clone_manifest_repo(temp_path)
-        except Exception as e:
-            print(f"Error: Failed to clone manifest repository: {e}")
-            sys.exit(1)
-
-        # Find restricted manifests that reference this project/branch
-        restricted_manifests = get_restricted_manifests(project_name, base_branch, manifest_dir)
+    # Find restricted manifests that reference this project/branch
+    try:
+        restricted_manifests = find_restricted_manifests(project_name, base_branch, gh_token)
+    except Exception as e:
+        print(f"Error: Failed to fetch manifest repository: {e}")
+        sys.exit(1)
 
-        if not restricted_manifests:
-            print(f"✅ Branch '{base_branch}' for project '{project_name}' is not part of any restricted release manifest. Skipping extra checks.")
-            sys.exit(0)
+    if not restricted_manifests:
+        print(f"✅ Branch '{base_branch}' for project '{project_name}' is not part of any restricted release manifest. Skipping extra checks.")
+        sys.exit(0)
 
-        print(f"Found {len(restricted_manifests)} restricted manifest(s) that reference this project/branch:")
-        for manifest in restricted_manifests:
-            print(f"  - {manifest['manifest_path']} (approval ticket: {manifest['approval_ticket']})")
+    print(f"Found {len(restricted_manifests)} restricted manifest(s) that reference this project/branch:")
+    for manifest in restricted_manifests:
+        print(f"  - {manifest['manifest_path']} (approval ticket: {manifest['approval_ticket']})")
 
-        # Get JIRA keys from commit messages
-        jira_keys = get_jira_keys_from_commits(repo, pr_number, gh_token)
-        print(f"JIRA references found in commit messages: {', '.join(sorted(jira_keys)) if jira_keys else 'None'}")
+    # Get JIRA keys from commit messages
+    jira_keys = get_jira_keys_from_commits(repo, pr_number, gh_token)
+    print(f"JIRA references found in commit messages: {', '.join(sorted(jira_keys)) if jira_keys else 'None'}")
 
-        if not jira_keys:
-            print("❌ No JIRA ticket reference found in any commit message. Please include a JIRA issue key in at least one commit message.")
-            sys.exit(1)
+    if not jira_keys:
+        print("❌ No JIRA ticket reference found in any commit message. Please include a JIRA issue key in at least one commit message.")
+        sys.exit(1)
 
-        # Check approval for each restricted manifest
-        all_approved = True
-        for manifest in restricted_manifests:
-            approval_ticket = manifest['approval_ticket']
+    # Group restricted manifests by approval ticket so each ticket is fetched and checked once
+    manifests_by_ticket = {}
+    for manifest in restricted_manifests:
+        manifests_by_ticket.setdefault(manifest['approval_ticket'], []).append(manifest)
+
+    # Fetch approved JIRA keys for all approval tickets concurrently
+    approval_tickets = list(manifests_by_ticket)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        approved_keys_per_ticket = list(executor.map(
+            lambda ticket: get_approved_jira_keys(ticket, jira_url, jira_user, jira_token),
+            approval_tickets,
+        ))
+
+    # Check approval for each ticket, applying the verdict to all of its manifests
+    all_approved = True
+    for approval_ticket, approved_keys in zip(approval_tickets, approved_keys_per_ticket):
+        # Check if all commit JIRA keys are approved
+        not_approved = sorted(jira_keys - approved_keys) if approved_keys else []
+        if not approved_keys or not_approved:
+            all_approved = False
+
+        for manifest in manifests_by_ticket[approval_ticket]:
             release_name = manifest['release_name']
 
             print(f"Checking approval for manifest {manifest['manifest_path']} (approval ticket: {approval_ticket})")
 
-            # Get approved JIRA keys for this manifest
-            approved_keys = get_approved_jira_keys(approval_ticket, jira_url, jira_user, jira_token)
-
             if not approved_keys:
                 print(f"❌ Could not retrieve approved tickets for {approval_ticket}")
-                all_approved = False
-                continue
-
-            # Check if all commit JIRA keys are approved
-            not_approved = [key for key in jira_keys if key not in approved_keys]
-            if not_approved:
+            elif not_approved:
                 print(f"❌ The following JIRA ticket(s) are not approved for {release_name}: {', '.join(not_approved)}. "
                       f"Please link these issue(s) in the approval ticket {approval_ticket} before merging.")
-                all_approved = False
             else:
                 print(f"✅ All JIRA tickets are approved for {release_name}")
 
-        if not all_approved:
-            sys.exit(1)
+    if not all_approved:
+        sys.exit(1)
 
-        print("\n✅ All checks passed. All JIRA tickets referenced in commits are approved for all restricted manifests.")
+    print("\n✅ All checks passed. All JIRA tickets referenced in commits are approved for all restricted manifests.")
 
 
 if __name__ == "__main__":